@@ -2,14 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Callable
+from types import MappingProxyType
+from typing import Any, Callable
 
+import aiohttp
 from aiohttp.client_exceptions import ClientError
+from yarl import URL
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.helpers import aiohttp_client, event
+from homeassistant.helpers import event
 from homeassistant.util import dt as dt_util
 from homeassistant.loader import async_get_integration
 
@@ -19,70 +24,180 @@ from .const import (
     CONF_TOKEN,
     CONF_INTERVAL,
     DEFAULT_INTERVAL,
+    ATTR_PUBLIC_IP,
+    ATTR_LAST_STATUS,
+    ATTR_LAST_ERROR,
+    ATTR_LAST_UPDATED,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[str] = ["sensor"]
 
+UPDATE_URL = "https://casadns.eu/update"
+IPIFY_V4_URL = "https://ipv4.api.ipify.org"
+IPIFY_V6_URL = "https://ipv6.api.ipify.org"
+
+# Shared per-request timeout; one instance instead of a fresh ClientTimeout
+# built from a bare int on every session.get
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_read=8)
+
+# Deadline for one whole IP check + CasaDNS push cycle
+UPDATE_CYCLE_TIMEOUT = 30
+
+# Grace window granted to the IPv6 lookup once IPv4 has answered,
+# modelled on the Happy Eyeballs resolution delay (RFC 8305)
+IPV6_GRACE = 0.05
+
+# Window within which rapid update_now service calls coalesce into one update
+FORCE_DEBOUNCE = 0.5
+
+# Window within which a forced update is skipped when the IPs are unchanged
+# and the previous CasaDNS push already succeeded
+REPUSH_GRACE = 300
+
+# hass.data key holding the per-entry ((ipv4, ipv6), monotonic) record of
+# the last successful push; lives outside the manager so it survives the
+# manager rebuilt by a config entry reload
+DATA_LAST_PUSH = f"{DOMAIN}_last_push"
+
+
+@dataclass(frozen=True, slots=True)
+class _Cfg:
+    """Merged config entry data + options (options override data)."""
+
+    domains: str
+    token: str
+    interval_minutes: int
+
 
 class CasaDNSManager:
     """Handle CasaDNS periodic updates and state."""
 
+    __slots__ = (
+        "hass",
+        "entry",
+        "_ua",
+        "_cfg",
+        "_interval",
+        "_headers",
+        "_base_url",
+        "_session",
+        "_unsub_timer",
+        "_inflight",
+        "_last_tick_monotonic",
+        "_pending_force",
+        "last_ip",
+        "last_ipv4",
+        "last_ipv6",
+        "_ip_cache_until",
+        "_stable_hits",
+        "last_status",
+        "last_error",
+        "last_updated",
+        "last_updated_iso",
+        "_attrs",
+        "attrs_view",
+        "_listeners",
+    )
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, user_agent: str) -> None:
         self.hass = hass
         self.entry = entry
         self._ua = user_agent
 
         # Merge data + options (options override data)
-        cfg = dict(entry.data)
-        cfg.update(entry.options or {})
+        merged = dict(entry.data)
+        merged.update(entry.options or {})
+
+        self._cfg = _Cfg(
+            domains=merged.get(CONF_DOMAINS, entry.data[CONF_DOMAINS]),
+            token=merged.get(CONF_TOKEN, entry.data[CONF_TOKEN]),
+            interval_minutes=merged.get(CONF_INTERVAL, DEFAULT_INTERVAL),
+        )
 
-        self._domains: str = cfg.get(CONF_DOMAINS, entry.data[CONF_DOMAINS])
-        self._token: str = cfg.get(CONF_TOKEN, entry.data[CONF_TOKEN])
-        self._interval_minutes: int = cfg.get(CONF_INTERVAL, DEFAULT_INTERVAL)
+        # Invariants for the hot paths, computed once
+        self._interval = timedelta(minutes=self._cfg.interval_minutes)
+        self._headers = {
+            "Content-Type": "text/html",
+            "User-Agent": self._ua,
+        }
+
+        # Domains and token never change after setup: quote them into the
+        # base query once instead of re-encoding them on every call
+        self._base_url = URL(UPDATE_URL).with_query(
+            {
+                "domains": self._cfg.domains,
+                "token": self._cfg.token,
+                "clear": "true",
+            }
+        )
+
+        # Dedicated session so warm keep-alive connections and cached DNS
+        # lookups to ipify/casadns.eu survive between update intervals.
+        # One long-lived connection per host, kept alive well past the
+        # default interval so consecutive updates skip the TCP+TLS setup;
+        # resolved addresses are cached for an hour so interval-scale
+        # updates never wait on the resolver.
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=4,
+                limit_per_host=1,
+                force_close=False,
+                use_dns_cache=True,
+                ttl_dns_cache=3600,
+                resolver=aiohttp.AsyncResolver(),
+                keepalive_timeout=600,
+                enable_cleanup_closed=True,
+            ),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
 
         self._unsub_timer = None
 
-        # Last known IP (IPv6 if available, otherwise IPv4)
-        self._last_ip: str | None = None
+        # In-flight update task, shared by concurrent callers (single-flight)
+        self._inflight: asyncio.Task | None = None
 
-        # Last CasaDNS call info
-        self._last_status: int | None = None
-        self._last_error: str | None = None
-        self._last_updated = None  # datetime | None
+        # Monotonic timestamp of the last accepted timer tick, used to
+        # swallow spurious early re-fires of the interval timer
+        self._last_tick_monotonic: float = 0
 
-        self._listeners: list[Callable[[], None]] = []
+        # Pending debounced flush of forced updates (update_now bursts)
+        self._pending_force: asyncio.TimerHandle | None = None
 
-    @property
-    def last_ip(self) -> str | None:
-        """Return last known public IP (IPv6 preferred, otherwise IPv4)."""
-        return self._last_ip
+        # Last known public IPs, read directly by the sensors
+        # (plain slot attributes: no property/descriptor indirection)
+        self.last_ip: str | None = None
+        self.last_ipv4: str | None = None
+        self.last_ipv6: str | None = None
 
-    @property
-    def last_status(self) -> int | None:
-        """Return last HTTP status of CasaDNS call."""
-        return self._last_status
+        # TTL memo: while the WAN IP keeps coming back unchanged, back off
+        # the ipify lookups and serve the cached pair until this deadline
+        self._ip_cache_until: float = 0
+        self._stable_hits: int = 0
 
-    @property
-    def last_error(self) -> str | None:
-        """Return last error message, if any."""
-        return self._last_error
+        # Last CasaDNS call info
+        self.last_status: int | None = None
+        self.last_error: str | None = None
+        self.last_updated = None  # datetime | None
+        self.last_updated_iso: str | None = None
+
+        # Sensor attribute dict, rebuilt in place once per update cycle;
+        # both sensors share the same read-only view of it
+        self._attrs: dict[str, Any] = {}
+        self.attrs_view: MappingProxyType[str, Any] = MappingProxyType(self._attrs)
 
-    @property
-    def last_updated(self):
-        """Return datetime of last CasaDNS call."""
-        return self._last_updated
+        # Immutable tuple so update fanout needs no defensive copy
+        self._listeners: tuple[Callable[[], None], ...] = ()
 
     def register_listener(self, callback: Callable[[], None]) -> None:
         """Register a callback to be called when data changes."""
-        self._listeners.append(callback)
+        self._listeners = self._listeners + (callback,)
 
     async def async_start(self) -> None:
         """Start periodic update task."""
-        interval = timedelta(minutes=self._interval_minutes)
         self._unsub_timer = event.async_track_time_interval(
-            self.hass, self._async_timer_callback, interval
+            self.hass, self._async_timer_callback, self._interval
         )
 
         # Initial run at startup
@@ -94,104 +209,306 @@ class CasaDNSManager:
             self._unsub_timer()
             self._unsub_timer = None
 
-    async def _async_timer_callback(self, now) -> None:
-        """Timer callback: check IP and update CasaDNS if needed."""
-        await self.async_update_dns(force=False)
+        if self._pending_force is not None:
+            self._pending_force.cancel()
+            self._pending_force = None
 
-    async def async_update_dns(self, force: bool = False) -> None:
-        """Check current public IP and call CasaDNS if changed or forced."""
-        current_ip = await self._async_get_public_ip()
+        await self._session.close()
 
-        if current_ip is None:
-            _LOGGER.warning(
-                "Could not determine public IP (IPv4/IPv6), skipping CasaDNS update"
-            )
+    def async_request_forced_update(self) -> None:
+        """Schedule a forced update, coalescing bursts into one request.
+
+        Rapid successive update_now calls (e.g. automations reacting to
+        network-up events) within the debounce window share one flush.
+        The flush pushes unconditionally (force_hard): a user pressing
+        "update now" expects a push even right after a successful one,
+        e.g. after deleting the record on casadns.eu.
+        """
+        if self._pending_force is not None:
             return
 
-        if not force and self._last_ip == current_ip:
-            _LOGGER.debug(
-                "Public IP unchanged (%s), skipping CasaDNS update", current_ip
+        def _flush() -> None:
+            self._pending_force = None
+            self.hass.async_create_task(
+                self.async_update_dns(force=True, force_hard=True)
             )
+
+        self._pending_force = self.hass.loop.call_later(FORCE_DEBOUNCE, _flush)
+
+    async def _async_timer_callback(self, now) -> None:
+        """Timer callback: check IP and update CasaDNS if needed."""
+        # The interval timer can re-fire slightly early; skip ticks that
+        # arrive before (almost) a full interval has elapsed
+        tick = time.monotonic()
+        if tick - self._last_tick_monotonic < self._cfg.interval_minutes * 60 - 1:
             return
+        self._last_tick_monotonic = tick
 
-        old_ip = self._last_ip
-        self._last_ip = current_ip
+        await self.async_update_dns(force=False)
 
-        _LOGGER.info("Public IP changed from %s to %s", old_ip, current_ip)
+    async def async_update_dns(
+        self, force: bool = False, force_hard: bool = False
+    ) -> None:
+        """Check current public IPs and call CasaDNS if changed or forced.
+
+        Concurrent callers (timer tick vs. update_now service) share the
+        same in-flight update instead of fanning out duplicate requests.
+        A forced caller cannot piggyback on an unforced cycle, which may
+        legitimately skip the push, so it runs its own cycle once the
+        in-flight one finishes. force_hard additionally bypasses the
+        recent-push idempotency guard, for user-triggered updates.
+        """
+        inflight = self._inflight
+        if inflight is not None and not inflight.done():
+            await asyncio.shield(inflight)
+            if not force:
+                return
+
+        task = self.hass.async_create_task(
+            self._async_do_update(force, force_hard)
+        )
+        self._inflight = task
+        try:
+            await task
+        finally:
+            # Another caller may have installed a newer task while we
+            # were suspended; only clear our own
+            if self._inflight is task:
+                self._inflight = None
+
+    async def _async_do_update(self, force: bool, force_hard: bool = False) -> None:
+        """Run one full IP check + CasaDNS update cycle.
+
+        The whole cycle runs under a single deadline so a stuck fetch
+        cannot starve later timer ticks.
+        """
+        try:
+            async with asyncio.timeout(UPDATE_CYCLE_TIMEOUT):
+                ipv4, ipv6 = await self._async_get_public_ips(force=force)
 
-        # Notify listeners (e.g. sensor) of new IP
-        for callback in list(self._listeners):
-            try:
-                callback()
-            except Exception:  # noqa: BLE001
-                _LOGGER.exception("Error in CasaDNS listener callback")
+                if ipv4 is None and ipv6 is None:
+                    _LOGGER.warning(
+                        "Could not determine public IP (IPv4/IPv6), skipping CasaDNS update"
+                    )
+                    return
 
-        await self._async_call_casadns(ip=current_ip)
+                if not force and self.last_ipv4 == ipv4 and self.last_ipv6 == ipv6:
+                    _LOGGER.debug(
+                        "Public IPs unchanged (IPv4 %s, IPv6 %s), skipping CasaDNS update",
+                        ipv4,
+                        ipv6,
+                    )
+                    return
+
+                # Idempotency guard: a forced update right after a
+                # successful push of the same IPs would just re-send the
+                # same records, so skip it; force_hard (the update_now
+                # service) pushes regardless. The record lives in
+                # hass.data so a config entry reload, which rebuilds the
+                # manager, still hits the guard.
+                last_push = self.hass.data.get(DATA_LAST_PUSH, {}).get(
+                    self.entry.entry_id
+                )
+                if (
+                    force
+                    and not force_hard
+                    and last_push is not None
+                    and last_push[0] == (ipv4, ipv6)
+                    and time.monotonic() - last_push[1] < REPUSH_GRACE
+                ):
+                    _LOGGER.debug(
+                        "Recent successful push with unchanged IPs, "
+                        "skipping forced CasaDNS update"
+                    )
+                    return
+
+                old_ipv4 = self.last_ipv4
+                old_ipv6 = self.last_ipv6
+                self.last_ipv4 = ipv4
+                self.last_ipv6 = ipv6
+                self.last_ip = ipv6 or ipv4
+                self._rebuild_attrs()
+
+                _LOGGER.info(
+                    "Public IPs changed from (IPv4 %s, IPv6 %s) to (IPv4 %s, IPv6 %s)",
+                    old_ipv4,
+                    old_ipv6,
+                    ipv4,
+                    ipv6,
+                )
+
+                # Notify listeners (e.g. sensor) of new IPs
+                for callback in self._listeners:
+                    try:
+                        callback()
+                    except Exception:  # noqa: BLE001
+                        _LOGGER.exception("Error in CasaDNS listener callback")
+
+                await self._async_call_casadns(ipv4=ipv4, ipv6=ipv6)
+        except TimeoutError:
+            self.last_error = "update cycle timed out"
+            _LOGGER.error(
+                "CasaDNS update cycle timed out after %s seconds",
+                UPDATE_CYCLE_TIMEOUT,
+            )
+        finally:
+            # Every exit path refreshes the shared attrs view, so failures
+            # (last_error) surface on the next state write even when the
+            # cycle returned early without pushing
+            self._rebuild_attrs()
 
-    async def _async_get_public_ip(self) -> str | None:
-        """Retrieve public IP using api64.ipify.org.
+    def _rebuild_attrs(self) -> None:
+        """Rebuild the cached sensor attribute dict.
 
-        Returns IPv6 if available, otherwise IPv4.
+        Home Assistant reads extra_state_attributes on every state write;
+        assembling the dict here amortizes that work to once per update.
         """
-        session = aiohttp_client.async_get_clientsession(self.hass)
+        attrs = self._attrs
+        attrs.clear()
+
+        if self.last_ip:
+            attrs[ATTR_PUBLIC_IP] = self.last_ip
+        if self.last_status is not None:
+            attrs[ATTR_LAST_STATUS] = self.last_status
+        if self.last_error:
+            attrs[ATTR_LAST_ERROR] = self.last_error
+        if self.last_updated_iso:
+            attrs[ATTR_LAST_UPDATED] = self.last_updated_iso
+
+    async def _async_get_public_ips(
+        self, force: bool = False
+    ) -> tuple[str | None, str | None]:
+        """Retrieve public IPv4 and IPv6 concurrently using ipify.
+
+        Returns a (ipv4, ipv6) tuple; either side is None when unavailable.
+        The two lookups race in parallel, Happy Eyeballs style: when IPv4
+        answers first, IPv6 only gets a short grace window before the
+        update proceeds without it, so a slow or missing IPv6 path never
+        delays the cycle. A lookup abandoned after the grace window or
+        failing with a network error is unknown, not absent: it falls
+        back to the last known address so a stable dual-stack host never
+        sees its AAAA record flap. While the pair keeps coming back
+        unchanged the lookups are skipped entirely for a growing TTL
+        (capped at one hour); force=True bypasses the memo.
+        """
+        if not force and time.monotonic() < self._ip_cache_until:
+            _LOGGER.debug(
+                "Public IP cache still valid, skipping ipify lookup"
+            )
+            return self.last_ipv4, self.last_ipv6
 
-        try:
-            async with session.get("https://api64.ipify.org", timeout=10) as resp:
+        session = self._session
+
+        async def _fetch(url: str) -> str | None:
+            async with session.get(url, timeout=REQUEST_TIMEOUT) as resp:
                 if resp.status != 200:
                     _LOGGER.warning(
-                        "Error getting public IP from api64.ipify.org: HTTP %s",
-                        resp.status,
+                        "Error getting public IP from %s: HTTP %s", url, resp.status
                     )
                     return None
                 return (await resp.text()).strip()
-        except (ClientError, asyncio.TimeoutError) as err:
-            _LOGGER.error("Error getting public IP from api64.ipify.org: %s", err)
-            self._last_error = str(err)
-            return None
-
-    async def _async_call_casadns(self, ip: str | None) -> None:
-        """Perform CasaDNS update call with clear + current IP."""
-        session = aiohttp_client.async_get_clientsession(self.hass)
-
-        base = (
-            "https://casadns.eu/update"
-            f"?domains={self._domains}"
-            f"&token={self._token}"
+
+        v4_task = asyncio.create_task(_fetch(IPIFY_V4_URL))
+        v6_task = asyncio.create_task(_fetch(IPIFY_V6_URL))
+
+        done, pending = await asyncio.wait(
+            {v4_task, v6_task}, timeout=10, return_when=asyncio.FIRST_COMPLETED
         )
 
-        params: list[str] = []
+        if pending:
+            if v6_task in pending and v4_task in done:
+                # IPv4 answered first: give IPv6 the grace window only
+                await asyncio.wait(pending, timeout=IPV6_GRACE)
+            else:
+                # IPv4 is the primary record, wait it out
+                await asyncio.wait(pending, timeout=10)
+
+        ipv4, v4_ok = await self._async_take_ip(v4_task, IPIFY_V4_URL, self.last_ipv4)
+        ipv6, v6_ok = await self._async_take_ip(v6_task, IPIFY_V6_URL, self.last_ipv6)
+
+        if (ipv4, ipv6) != (self.last_ipv4, self.last_ipv6):
+            self._stable_hits = 0
+            self._ip_cache_until = 0
+        elif v4_ok and v6_ok and (ipv4 is not None or ipv6 is not None):
+            # Both lookups really answered and matched the previous pair:
+            # extend the memo, growing with each stable tick. Fallback
+            # results never extend it, so an outage (when the WAN IP is
+            # most likely to change) cannot push real lookups out.
+            self._stable_hits += 1
+            self._ip_cache_until = time.monotonic() + min(
+                3600, 60 * self._stable_hits
+            )
+
+        return ipv4, ipv6
 
-        # Always clear existing records (A + AAAA)
-        params.append("clear=true")
+    async def _async_take_ip(
+        self, task: asyncio.Task, url: str, fallback: str | None
+    ) -> tuple[str | None, bool]:
+        """Collect the result of a finished ipify task, cancelling stragglers.
 
-        # If we have an IP, send it; otherwise this will just clear records
-        if ip:
-            params.append(f"ip={ip}")
+        Returns (address, answered). An abandoned or errored lookup means
+        the address is unknown, not gone, so it resolves to the last known
+        address with answered=False instead of None.
+        """
+        if not task.done():
+            task.cancel()
+            _LOGGER.debug("Public IP lookup from %s abandoned after grace window", url)
 
-        url = base + "&" + "&".join(params)
+        try:
+            return await task, True
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return fallback, False
+            raise
+        except (ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.error("Error getting public IP from %s: %s", url, err)
+            self.last_error = str(err)
+            return fallback, False
+
+    async def _async_call_casadns(
+        self, ipv4: str | None, ipv6: str | None
+    ) -> None:
+        """Perform CasaDNS update call with clear + current IPs."""
+        session = self._session
+
+        # The base URL already carries domains/token/clear; only the IPs
+        # vary per call. If we have none, this will just clear records.
+        extra: dict[str, str] = {}
+        if ipv4:
+            extra["ip"] = ipv4
+        elif ipv6:
+            extra["ip"] = ipv6
+        if ipv6:
+            extra["ipv6"] = ipv6
+
+        url = self._base_url.update_query(extra) if extra else self._base_url
 
         try:
             async with session.get(
                 url,
-                timeout=10,
-                headers={
-                    "Content-Type": "text/html",
-                    "User-Agent": self._ua
-                }
+                timeout=REQUEST_TIMEOUT,
+                headers=self._headers,
             ) as resp:
                 text = await resp.text()
-                self._last_status = resp.status
-                self._last_updated = dt_util.utcnow()
-                self._last_error = None
+                self.last_status = resp.status
+                self.last_updated = dt_util.utcnow()
+                # Formatted once here instead of on every state read
+                self.last_updated_iso = dt_util.as_local(
+                    self.last_updated
+                ).isoformat()
+                self.last_error = None
 
                 if resp.status != 200:
                     _LOGGER.error(
                         "CasaDNS update failed: HTTP %s - %s", resp.status, text
                     )
                 else:
+                    self.hass.data.setdefault(DATA_LAST_PUSH, {})[
+                        self.entry.entry_id
+                    ] = ((ipv4, ipv6), time.monotonic())
                     _LOGGER.debug("CasaDNS update OK: %s", text)
         except (ClientError, asyncio.TimeoutError) as err:
-            self._last_error = str(err)
+            self.last_error = str(err)
             _LOGGER.error("Error calling CasaDNS: %s", err)
 
 
@@ -208,7 +525,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     async def handle_update_now(call: ServiceCall) -> None:
         """Handle manual service call to force an update."""
-        await manager.async_update_dns(force=True)
+        manager.async_request_forced_update()
 
     hass.services.async_register(DOMAIN, "update_now", handle_update_now)
 
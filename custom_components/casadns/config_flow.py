@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import re
+import sys
 from typing import Any
 
 import voluptuous as vol
@@ -17,24 +19,44 @@ from .const import (
 )
 
 
-def _normalize_domains(raw: str) -> str:
-    """Normalize CasaDNS domains."""
-    parts: list[str] = []
-
-    for item in raw.split(","):
-        label = item.strip().lower()
-        if not label:
-            # Skip empty pieces (e.g. trailing comma)
-            continue
+# Suffix users tend to paste along with their domain; stripped during
+# normalization
+_CASADNS_SUFFIX = ".casadns.eu"
 
-        # Strip optional .casadns.eu if user accidentally adds it
-        if label.endswith(".casadns.eu"):
-            label = label[: -len(".casadns.eu")]
+# One pass over the input: capture each label, consuming surrounding
+# whitespace, an optional .casadns.eu suffix and the trailing comma in the
+# same C-level scan instead of split + strip + removesuffix per label.
+# The capture admits the empty string (filtered below) so a token that is
+# nothing but the suffix yields no label, and it keeps internal whitespace
+# intact, matching the old split-based normalization
+_DOMAIN_RE = re.compile(
+    rf"\s*([^,]*?)(?:{re.escape(_CASADNS_SUFFIX)})?\s*(?:,|$)",
+    re.IGNORECASE,
+)
 
-        if label:
-            parts.append(label)
 
-    return ",".join(parts)
+def _normalize_domains(raw: str) -> str:
+    """Normalize CasaDNS domains."""
+    # Common rejected-form case: skip the regex scan entirely
+    if not raw or raw.isspace():
+        return ""
+
+    # Interned so repeated labels across saves/reloads share one str object
+    return ",".join(
+        sys.intern(match.group(1).lower())
+        for match in _DOMAIN_RE.finditer(raw)
+        if match.group(1)
+    )
+
+
+# Built once at import so every form render reuses the same compiled schema
+_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DOMAINS): str,
+        vol.Required(CONF_TOKEN): str,
+        vol.Optional(CONF_INTERVAL, default=DEFAULT_INTERVAL): int,
+    }
+)
 
 
 class CasaDNSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -60,13 +82,16 @@ class CasaDNSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             normalized_domains = _normalize_domains(raw_domains)
 
-            # Basic validation
-            if not normalized_domains:
-                errors["base"] = "invalid_domains"
-            elif not token:
-                errors["base"] = "invalid_token"
-            elif interval < 15:
-                errors["base"] = "invalid_interval"
+            # Basic validation: first failing check wins, and new checks
+            # slot into the table without growing an elif chain
+            for ok, code in (
+                (bool(normalized_domains), "invalid_domains"),
+                (bool(token), "invalid_token"),
+                (interval >= 15, "invalid_interval"),
+            ):
+                if not ok:
+                    errors["base"] = code
+                    break
 
             if not errors:
                 return self.async_create_entry(
@@ -78,17 +103,9 @@ class CasaDNSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     },
                 )
 
-        data_schema = vol.Schema(
-            {
-                vol.Required(CONF_DOMAINS): str,
-                vol.Required(CONF_TOKEN): str,
-                vol.Optional(CONF_INTERVAL, default=DEFAULT_INTERVAL): int,
-            }
-        )
-
         return self.async_show_form(
             step_id="user",
-            data_schema=data_schema,
+            data_schema=_DATA_SCHEMA,
             errors=errors,
         )
 
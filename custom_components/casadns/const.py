@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 DOMAIN = "casadns"
 
 CONF_DOMAINS = "domains"
@@ -8,7 +10,10 @@ CONF_INTERVAL = "interval"
 
 DEFAULT_INTERVAL = 15
 
-ATTR_PUBLIC_IP = "public_ip"
-ATTR_LAST_STATUS = "last_status"
-ATTR_LAST_ERROR = "last_error"
-ATTR_LAST_UPDATED = "last_updated"
+# Interned so the attribute dict keys share identity with equal strings
+# elsewhere in Home Assistant, keeping dict lookups on the pointer-compare
+# fast path
+ATTR_PUBLIC_IP = sys.intern("public_ip")
+ATTR_LAST_STATUS = sys.intern("last_status")
+ATTR_LAST_ERROR = sys.intern("last_error")
+ATTR_LAST_UPDATED = sys.intern("last_updated")
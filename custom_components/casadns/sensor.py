@@ -1,20 +1,15 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.util import dt as dt_util
 
-from .const import (
-    DOMAIN,
-    ATTR_PUBLIC_IP,
-    ATTR_LAST_STATUS,
-    ATTR_LAST_ERROR,
-    ATTR_LAST_UPDATED,
-)
+from .const import DOMAIN
 
 
 async def async_setup_entry(
@@ -26,60 +21,83 @@ async def async_setup_entry(
     manager = hass.data[DOMAIN][entry.entry_id]
     entities: list[SensorEntity] = [
         CasaDNSPublicIPSensor(manager, entry),
+        CasaDNSIPSensor(manager, entry, "v4"),
+        CasaDNSIPSensor(manager, entry, "v6"),
     ]
     async_add_entities(entities)
 
 
-class CasaDNSPublicIPSensor(SensorEntity):
-    """Sensor that exposes the current public IP used by CasaDNS."""
+class BaseCasaDNSSensor(SensorEntity):
+    """Common behaviour for the CasaDNS sensors."""
+
+    # Entity itself keeps a __dict__ (for the _attr_* machinery), but our
+    # own per-entity attributes still get slot-speed access
+    __slots__ = ("_manager", "_entry", "_device_info", "_value_attr")
 
     _attr_has_entity_name = True
-    _attr_translation_key = "public_ip"
     _attr_icon = "mdi:ip-outline"
 
     def __init__(self, manager, entry: ConfigEntry) -> None:
         self._manager = manager
         self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_public_ip"
+
+        # Static for the entity's lifetime; built once instead of per
+        # device_info read during registry syncs and entity updates.
+        # frozenset identifiers hash once and never need rehashing.
+        self._device_info = DeviceInfo(
+            identifiers=frozenset({(DOMAIN, entry.entry_id)}),
+            name="CasaDNS DDNS",
+            manufacturer="EMTRONIC",
+            model="CasaDNS",
+        )
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks when entity is added."""
-
-        def _handle_update() -> None:
-            self.async_write_ha_state()
-
-        self._manager.register_listener(_handle_update)
+        # The bound method is already a zero-arg callable; no closure needed
+        self._manager.register_listener(self._handle_manager_update)
+        self._handle_manager_update()
+
+    @callback
+    def _handle_manager_update(self) -> None:
+        """Refresh the cached native value and push the new state.
+
+        The value is copied into _attr_native_value on change so HA's
+        read path never goes through a property of ours.
+        """
+        self._attr_native_value = getattr(self._manager, self._value_attr)
         self.async_write_ha_state()
 
     @property
-    def native_value(self) -> Any:
-        """Return the current public IP (IPv6 or IPv4)."""
-        return self._manager.last_ip
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return extra attributes."""
-        attrs: dict[str, Any] = {}
-
-        if self._manager.last_ip:
-            attrs[ATTR_PUBLIC_IP] = self._manager.last_ip
-        if self._manager.last_status is not None:
-            attrs[ATTR_LAST_STATUS] = self._manager.last_status
-        if self._manager.last_error:
-            attrs[ATTR_LAST_ERROR] = self._manager.last_error
-        if self._manager.last_updated:
-            attrs[ATTR_LAST_UPDATED] = dt_util.as_local(
-                self._manager.last_updated
-            ).isoformat()
-
-        return attrs
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        """Return extra attributes, prebuilt by the manager per update."""
+        return self._manager.attrs_view
 
     @property
-    def device_info(self) -> dict[str, Any]:
+    def device_info(self) -> DeviceInfo:
         """Return device info so the sensor is grouped under one CasaDNS device."""
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": "CasaDNS DDNS",
-            "manufacturer": "EMTRONIC",
-            "model": "CasaDNS",
-        }
+        return self._device_info
+
+
+class CasaDNSPublicIPSensor(BaseCasaDNSSensor):
+    """Sensor that exposes the current public IP used by CasaDNS."""
+
+    __slots__ = ()
+
+    _attr_translation_key = "public_ip"
+
+    def __init__(self, manager, entry: ConfigEntry) -> None:
+        super().__init__(manager, entry)
+        self._attr_unique_id = f"{entry.entry_id}_public_ip"
+        self._value_attr = "last_ip"
+
+
+class CasaDNSIPSensor(BaseCasaDNSSensor):
+    """Sensor for one address family, parameterized instead of subclassed."""
+
+    __slots__ = ()
+
+    def __init__(self, manager, entry: ConfigEntry, family: str) -> None:
+        super().__init__(manager, entry)
+        self._attr_translation_key = f"public_ip{family}"
+        self._attr_unique_id = f"{entry.entry_id}_public_ip{family}"
+        self._value_attr = f"last_ip{family}"